@@ -1,32 +1,37 @@
 import json
 import re
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 
+from llm_clients import ollama_chat, ollama_batch_chat
+from prompt_batching import (
+    DEFAULT_BATCH_TOKEN_BUDGET,
+    DEFAULT_MAX_FILES_PER_BATCH,
+    batch_num_ctx,
+    estimate_tokens,
+    pack_batches,
+    batch_ids,
+    split_batch_output,
+)
+
 
 # ---------------------------------------------------------
 # 1. LLM Client
 # ---------------------------------------------------------
 
-llm = ChatOllama(
-    model="qwen2.5:14b-instruct",  # recommended for speed OR "qwen2.5:14b-instruct" for accuracy
-    temperature=0.0,
-    num_predict=1024,
-)
+MODEL = "qwen2.5:14b-instruct"  # recommended for speed OR "qwen2.5:14b-instruct" for accuracy
+NUM_PREDICT = 1024
+
+llm = ollama_chat(MODEL, NUM_PREDICT)
 
 
 # ---------------------------------------------------------
 # 2. Agent A Prompt
 # ---------------------------------------------------------
 
-analyzer_prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """You are a STRICT C++ code analyzer.
+ANALYZER_SYSTEM_PROMPT = """You are a STRICT C++ code analyzer.
 
 Your job has TWO parts:
 
@@ -130,8 +135,11 @@ RULES:
 - DO NOT guess features—detect literally from text.
 - DO NOT output anything before or after the JSON.
 -----------------------------------------------------------
-""",
-        ),
+"""
+
+analyzer_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", ANALYZER_SYSTEM_PROMPT),
         (
             "human",
             "Here is the C++ code snippet:\n```cpp\n{code}\n```",
@@ -140,7 +148,35 @@ RULES:
 )
 
 
-# Link LLM
+BATCH_ANALYZER_ADDENDUM = """
+-----------------------------------------------------------
+### BATCH MODE
+-----------------------------------------------------------
+
+You receive SEVERAL independent C++ files, each introduced by a line
+`### FILE <id>`. Analyze EVERY file on its own, exactly as described above.
+
+In batch mode, return ONE JSON object mapping each file id to that file's result:
+
+{{
+  "files": {{
+    "F1": {{ "code_features": {{ ... }}, "selected_rule_categories": [ ... ] }},
+    "F2": {{ "code_features": {{ ... }}, "selected_rule_categories": [ ... ] }}
+  }}
+}}
+
+Include EVERY file id. Do NOT output anything before or after the JSON.
+"""
+
+batch_analyzer_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", ANALYZER_SYSTEM_PROMPT + BATCH_ANALYZER_ADDENDUM),
+        ("human", "Here are the C++ files:\n\n{files_block}"),
+    ]
+)
+
+
+# Default-model chain; the run_* functions build their own, this is kept for callers that import it
 analyzer_chain = analyzer_prompt | llm
 
 
@@ -163,12 +199,73 @@ def _extract_json(content: str) -> Dict[str, Any]:
 # 4. Public API
 # ---------------------------------------------------------
 
-def run_agent_a_analyze_and_select(code: str) -> Dict[str, Any]:
-    """Run Agent A on C++ code."""
-    resp = analyzer_chain.invoke({"code": code})
+def run_agent_a_analyze_and_select(
+    code: str,
+    model: Optional[str] = None,
+    llm: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Run Agent A on C++ code.
+    `model` picks a different Ollama model; `llm` (any LangChain chat model) overrides both.
+    """
+    chain = analyzer_prompt | (llm if llm is not None else ollama_chat(model or MODEL, NUM_PREDICT))
+    resp = chain.invoke({"code": code})
     return _extract_json(resp.content)
 
 
+def _format_files_block(ids: Dict[str, str], files: Dict[str, str]) -> str:
+    return "\n\n".join(
+        f"### FILE {file_id}\n```cpp\n{files[key]}\n```" for file_id, key in ids.items()
+    )
+
+
+def _is_agent_a_result(key: str, result: Any) -> bool:
+    return isinstance(result, dict) and isinstance(result.get("selected_rule_categories"), list)
+
+
+def run_agent_a_batch(
+    files: Dict[str, str],
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_files: int = DEFAULT_MAX_FILES_PER_BATCH,
+    model: Optional[str] = None,
+    llm: Optional[Any] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run Agent A on many small files, packing several into one request.
+
+    `files` maps a caller key (e.g. a path) to its code. Files are packed up to
+    `token_budget` prompt tokens; any file missing or malformed in a batched
+    answer (or a whole batch that is not JSON) is redone with a per-file call.
+    Batches and per-file calls share one num_ctx, so Ollama never reloads the model.
+    Returns {key: Agent A result} in the order of `files`.
+    """
+    model = model or MODEL
+    batch_llm = llm if llm is not None else ollama_batch_chat(model, NUM_PREDICT, max_files, token_budget)
+    file_llm = llm if llm is not None else ollama_chat(model, NUM_PREDICT, num_ctx=batch_num_ctx(token_budget))
+    fixed_tokens = estimate_tokens(ANALYZER_SYSTEM_PROMPT + BATCH_ANALYZER_ADDENDUM)
+
+    def batch_cost(keys):
+        return fixed_tokens + sum(estimate_tokens(files[k]) + 10 for k in keys)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for keys in pack_batches(list(files), batch_cost, token_budget, max_files):
+        if len(keys) > 1:
+            ids = batch_ids(keys)
+            chain = batch_analyzer_prompt | batch_llm
+            resp = chain.invoke({"files_block": _format_files_block(ids, files)})
+            try:
+                parsed = _extract_json(resp.content)
+            except ValueError:
+                parsed = {}
+            results.update(split_batch_output(parsed, ids, _is_agent_a_result))
+
+        for key in keys:
+            if key not in results:
+                results[key] = run_agent_a_analyze_and_select(files[key], llm=file_llm)
+
+    return {key: results[key] for key in files}
+
+
 # ---------------------------------------------------------
 # 5. File Loader
 # ---------------------------------------------------------
@@ -1,12 +1,21 @@
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 
 from agent_a_analyzer import run_agent_a_analyze_and_select, load_code
+from llm_clients import ollama_chat, ollama_batch_chat
+from prompt_batching import (
+    DEFAULT_BATCH_TOKEN_BUDGET,
+    DEFAULT_MAX_FILES_PER_BATCH,
+    batch_num_ctx,
+    estimate_tokens,
+    pack_batches,
+    batch_ids,
+    split_batch_output,
+)
 
 
 # ---------- 1. Load guidelines index ----------
@@ -90,22 +99,51 @@ def refine_categories_from_code(code: str, a_result: Dict[str, Any]) -> Dict[str
     return a_result
 
 
+# Any pointer declarator, allocation call or `auto` may hold a raw owner
+# (e.g. calloc/realloc/strdup results or `Foo* f = create();`)
+_OWNERSHIP_PATTERN = r"\*|\bnew\b|\bdelete\b|alloc|\bstrdup\b|_ptr\b|make_unique|make_shared|\bauto\b"
+
+# Categories that cannot apply when none of their constructs appear in the code.
+# Keep this conservative: a category belongs here only if code WITHOUT the pattern
+# can never violate it. Categories that absent code can violate (DOC, HDR include
+# guards, MOD-CONTAINER C arrays, ...) are left to the LLM.
+NOT_APPLICABLE_UNLESS = {
+    "UDT-CLASS": r"\b(class|struct)\b",
+    "MOD-CLASS": r"\b(class|struct)\b",
+    "MOD-MEM": _OWNERSHIP_PATTERN,
+    "APP-SMARTPTR": _OWNERSHIP_PATTERN,
+    "MOD-CONC": r"thread|mutex|atomic|std::async|std::future|#\s*pragma\s+omp",
+    "APP-CONC": r"thread|mutex|atomic|std::async|std::future|#\s*pragma\s+omp",
+}
+
+
+def decide_rules_locally(code: str, rules: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Return {rule_id: "not_applicable"} for rules whose category's constructs
+    are absent from the code. These need no LLM call; other rules are left out.
+    """
+    absent = {
+        cat for cat, pattern in NOT_APPLICABLE_UNLESS.items()
+        if not re.search(pattern, code)
+    }
+    return {
+        r.get("rule_id"): "not_applicable"
+        for r in rules
+        if r.get("category") in absent
+    }
+
+
 # ---------- 3. LLM client for Agent B ----------
 
-llm = ChatOllama(
-    model="qwen2.5:14b-instruct",  # or "qwen3:4b-instruct", "qwen2.5-coder:7b", etc.
-    temperature=0.0,
-    num_predict=2048,
-)
+MODEL = "qwen2.5:14b-instruct"  # or "qwen3:4b-instruct", "qwen2.5-coder:7b", etc.
+NUM_PREDICT = 2048
+
+llm = ollama_chat(MODEL, NUM_PREDICT)
 
 
 # ---------- 4. Reviewer prompt (Agent B) ----------
 
-reviewer_prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """You are a STRICT C++ coding guideline reviewer.
+REVIEWER_SYSTEM_PROMPT = """You are a STRICT C++ coding guideline reviewer.
 
 You receive:
 1) C++ code with line numbers at the start of each line.
@@ -189,15 +227,48 @@ Examples:
 - If the problem spans multiple lines (like a whole struct or class), use [start_line, end_line].
 
 Do NOT output anything before or after the JSON.
-""",
-        ),
-        (
-            "human",
-            "Mode: {mode}\n\nC++ code with line numbers:\n```cpp\n{code_with_lines}\n```\n\nGuideline rules (JSON array):\n```json\n{rules_json}\n```",
-        ),
+"""
+
+REVIEWER_HUMAN_PROMPT = "Mode: {mode}\n\nC++ code with line numbers:\n```cpp\n{code_with_lines}\n```\n\nGuideline rules (JSON array):\n```json\n{rules_json}\n```"
+
+reviewer_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", REVIEWER_SYSTEM_PROMPT),
+        ("human", REVIEWER_HUMAN_PROMPT),
+    ]
+)
+
+BATCH_REVIEWER_ADDENDUM = """
+### BATCH MODE
+
+You may receive SEVERAL independent C++ files, each introduced by a line
+`### FILE <id>` followed by the rule IDs to check for that file.
+Review EVERY file on its own, against ONLY its listed rules, exactly as described above.
+Line numbers restart at 1 for each file.
+
+In batch mode, return ONE JSON object mapping each file id to that file's result
+(each result has the exact shape described above):
+
+{{
+  "files": {{
+    "F1": {{ "mode": "...", "summary": {{ ... }}, "violations": [ ... ], "per_rule_status": [ ... ] }},
+    "F2": {{ "mode": "...", "summary": {{ ... }}, "violations": [ ... ], "per_rule_status": [ ... ] }}
+  }}
+}}
+
+Include EVERY file id. Do NOT output anything before or after the JSON.
+"""
+
+BATCH_REVIEWER_HUMAN_PROMPT = "Mode: {mode}\n\nGuideline rules (JSON array):\n```json\n{rules_json}\n```\n\nFiles to review:\n\n{files_block}"
+
+batch_reviewer_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", REVIEWER_SYSTEM_PROMPT + BATCH_REVIEWER_ADDENDUM),
+        ("human", BATCH_REVIEWER_HUMAN_PROMPT),
     ]
 )
 
+# Default-model chain; the run_* functions build their own, this is kept for callers that import it
 reviewer_chain = reviewer_prompt | llm
 
 
@@ -219,9 +290,19 @@ def run_agent_b_review(
     code: str,
     selected_categories: List[str],
     mode: str = "quick",
+    model: Optional[str] = None,
+    llm: Optional[Any] = None,
+    prompt: Optional[ChatPromptTemplate] = None,
+    rules: Optional[List[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
+    """
+    Review `code` against the rules of `selected_categories`.
+    `model` picks a different Ollama model; `llm` (any LangChain chat model)
+    overrides both; `prompt` replaces reviewer_prompt (same input variables);
+    `rules` reviews exactly these rules instead of selecting by category.
+    """
     # 1) Filter rules by categories
-    rules_for_review = select_rules_by_categories(selected_categories)
+    rules_for_review = rules if rules is not None else select_rules_by_categories(selected_categories)
 
     # 2) Slim rules before sending to the LLM
     rules_for_llm = slim_rules_for_llm(rules_for_review)
@@ -234,7 +315,8 @@ def run_agent_b_review(
     rules_json = json.dumps(rules_for_llm, ensure_ascii=False, indent=2)
 
     # 4) Invoke the chain
-    resp = reviewer_chain.invoke(
+    chain = (prompt or reviewer_prompt) | (llm if llm is not None else ollama_chat(model or MODEL, NUM_PREDICT))
+    resp = chain.invoke(
         {
             "mode": mode,
             "code_with_lines": code_with_lines,
@@ -246,6 +328,97 @@ def run_agent_b_review(
     return parsed
 
 
+def run_agent_b_batch(
+    files: Dict[str, str],
+    selected_categories: Dict[str, List[str]],
+    mode: str = "quick",
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_files: int = DEFAULT_MAX_FILES_PER_BATCH,
+    model: Optional[str] = None,
+    llm: Optional[Any] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run Agent B on many small files, packing several into one request.
+
+    `files` maps a caller key to its code and `selected_categories` maps the
+    same key to its categories. Each batch sends the union of its files' rules
+    once, and every file lists the rule IDs it must be checked against.
+    Files missing from a batched answer, or whose verdicts do not cover exactly
+    their listed rules (or a whole batch that is not JSON), are redone with
+    run_agent_b_review.
+    Batches and per-file calls share one num_ctx, so Ollama never reloads the model.
+    Returns {key: Agent B result} in the order of `files`.
+    """
+    model = model or MODEL
+    batch_llm = llm if llm is not None else ollama_batch_chat(model, NUM_PREDICT, max_files, token_budget)
+    file_llm = llm if llm is not None else ollama_chat(model, NUM_PREDICT, num_ctx=batch_num_ctx(token_budget))
+    fixed_tokens = estimate_tokens(REVIEWER_SYSTEM_PROMPT + BATCH_REVIEWER_ADDENDUM)
+
+    numbered = {key: add_line_numbers(code) for key, code in files.items()}
+    rule_ids = {
+        key: [r.get("rule_id") for r in select_rules_by_categories(selected_categories.get(key, []))]
+        for key in files
+    }
+
+    def batch_rules(keys: List[str]) -> List[Dict[str, Any]]:
+        wanted = {rule_id for k in keys for rule_id in rule_ids[k]}
+        return slim_rules_for_llm([r for r in GUIDELINES_INDEX if r.get("rule_id") in wanted])
+
+    def batch_cost(keys: List[str]) -> int:
+        rules_tokens = estimate_tokens(json.dumps(batch_rules(keys), ensure_ascii=False, indent=2))
+        files_tokens = sum(
+            estimate_tokens(numbered[k]) + estimate_tokens(", ".join(rule_ids[k])) + 10
+            for k in keys
+        )
+        return fixed_tokens + rules_tokens + files_tokens
+
+    def covers_its_rules(key: str, result: Any) -> bool:
+        # Exactly one verdict per listed rule; anything else is redone per file
+        if not isinstance(result, dict) or not isinstance(result.get("per_rule_status"), list):
+            return False
+        statuses = result["per_rule_status"]
+        if not all(isinstance(s, dict) and "status" in s for s in statuses):
+            return False
+        returned = [s.get("rule_id") for s in statuses]
+        return len(returned) == len(set(returned)) and set(returned) == set(rule_ids[key])
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for keys in pack_batches(list(files), batch_cost, token_budget, max_files):
+        if len(keys) > 1:
+            ids = batch_ids(keys)
+            rules_for_llm = batch_rules(keys)
+
+            files_block = "\n\n".join(
+                f"### FILE {file_id}\nRules to check: {', '.join(rule_ids[key])}\n"
+                f"```cpp\n{numbered[key]}\n```"
+                for file_id, key in ids.items()
+            )
+            chain = batch_reviewer_prompt | batch_llm
+            resp = chain.invoke(
+                {
+                    "mode": mode,
+                    "rules_json": json.dumps(rules_for_llm, ensure_ascii=False, indent=2),
+                    "files_block": files_block,
+                }
+            )
+            try:
+                parsed = _extract_json(resp.content)
+            except ValueError:
+                parsed = {}
+            results.update(split_batch_output(parsed, ids, covers_its_rules))
+
+        for key in keys:
+            if key not in results:
+                results[key] = run_agent_b_review(
+                    code=files[key],
+                    selected_categories=selected_categories.get(key, []),
+                    mode=mode,
+                    llm=file_llm,
+                )
+
+    return {key: results[key] for key in files}
+
+
 # ---------- 7. Manual test combining Agent A + B ----------
 
 if __name__ == "__main__":
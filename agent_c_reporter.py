@@ -1,18 +1,19 @@
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 
+from compact_results import CompactResults
+from llm_clients import ollama_chat
+
 
 # ---------- 1. LLM Client ----------
 
-llm = ChatOllama(
-    model="qwen2.5:14b-instruct",   # you can switch to "qwen3:4b-instruct" etc.
-    temperature=0.0,
-    num_predict=2048,
-)
+MODEL = "qwen2.5:14b-instruct"   # you can switch to "qwen3:4b-instruct" etc.
+NUM_PREDICT = 2048
+
+llm = ollama_chat(MODEL, NUM_PREDICT)
 
 
 # ---------- 2. Agent C Prompt ----------
@@ -107,6 +108,7 @@ RULES:
     ]
 )
 
+# Default-model chain; the run_* functions build their own, this is kept for callers that import it
 reporter_chain = reporter_prompt | llm
 
 
@@ -125,9 +127,16 @@ def _extract_json(content: str) -> Dict[str, Any]:
 
 # ---------- 4. Public API ----------
 
-def run_agent_c_reporter(agent_b_result: Dict[str, Any], code: str) -> Dict[str, Any]:
+def run_agent_c_reporter(
+    agent_b_result: Dict[str, Any],
+    code: str,
+    model: Optional[str] = None,
+    llm: Optional[Any] = None,
+) -> Dict[str, Any]:
     """
     Run Agent C on Agent B's JSON result + original code.
+    `model` overrides the Ollama model (default: MODEL); `llm` (any LangChain
+    chat model) overrides both.
 
     Returns:
         {
@@ -135,7 +144,8 @@ def run_agent_c_reporter(agent_b_result: Dict[str, Any], code: str) -> Dict[str,
           "executive_summary": "..."
         }
     """
-    resp = reporter_chain.invoke(
+    chain = reporter_prompt | (llm if llm is not None else ollama_chat(model or MODEL, NUM_PREDICT))
+    resp = chain.invoke(
         {
             "agent_b_json": json.dumps(agent_b_result, indent=2),
             "code": code,
@@ -144,7 +154,46 @@ def run_agent_c_reporter(agent_b_result: Dict[str, Any], code: str) -> Dict[str,
     return _extract_json(resp.content)
 
 
-# ---------- 5. Manual Test ----------
+# ---------- 5. Repository-level summary ----------
+
+def render_repository_summary(results: CompactResults, top_n: int = 20) -> str:
+    """
+    Deterministic Markdown summary over many files' Agent B results (no LLM call),
+    for repository-scale runs where one report per file is too much to read.
+    """
+    totals = results.summary_totals()
+    lines = [
+        "# C++ Code Review Summary (Repository)",
+        "",
+        f"Files reviewed: {len(results)}",
+        "",
+        "## Summary",
+        "",
+        "| Metric | Count |",
+        "|--------|-------|",
+        f"| Errors | {totals['errors']} |",
+        f"| Warnings | {totals['warnings']} |",
+        f"| Info | {totals['info']} |",
+        f"| Rules Checked | {totals['rules_checked']} |",
+        f"| Rules Failed | {totals['rules_failed']} |",
+        f"| Rules Passed | {totals['rules_passed']} |",
+        f"| Rules Not Applicable | {totals['rules_not_applicable']} |",
+        "",
+        "## Most Frequently Failed Rules",
+        "",
+    ]
+
+    top = results.top_failing_rules(top_n)
+    if not top:
+        lines.append("> No failed rules.")
+    else:
+        lines += ["| Rule ID | Files Failing |", "|---------|---------------|"]
+        lines += [f"| {rule_id} | {count} |" for rule_id, count in top]
+
+    return "\n".join(lines) + "\n"
+
+
+# ---------- 6. Manual Test ----------
 
 if __name__ == "__main__":
     sample_agent_b_json = {
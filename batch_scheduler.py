@@ -0,0 +1,255 @@
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+from ollama import Client
+
+import agent_a_analyzer
+import agent_b_reviewer
+import agent_c_reporter
+from agent_a_analyzer import run_agent_a_analyze_and_select, load_code
+from agent_b_reviewer import refine_categories_from_code, run_agent_b_review
+from agent_c_reporter import run_agent_c_reporter
+from run_full_pipeline import output_prefix, save_pipeline_outputs
+
+
+# ---------- 1. Config ----------
+
+# Default model per stage; override any of them via run_batch_pipeline(models=...)
+DEFAULT_STAGE_MODELS = {
+    "agent_a": agent_a_analyzer.MODEL,
+    "agent_b": agent_b_reviewer.MODEL,
+    "agent_c": agent_c_reporter.MODEL,
+}
+
+# Max calls served back-to-back on one model while other models have work waiting
+DEFAULT_MAX_CONSECUTIVE = 8
+
+# How long Ollama keeps a model resident after we load it
+KEEP_ALIVE = "10m"
+
+
+def load_model_with_ollama(model: str, keep_alive: Any = KEEP_ALIVE) -> None:
+    """Load `model` into Ollama (an empty prompt loads it without generating)."""
+    Client().generate(model=model, prompt="", keep_alive=keep_alive)
+
+
+# ---------- 2. Model-affinity scheduler ----------
+
+class ModelAffinityScheduler:
+    """
+    Run queued stage calls grouped by model to avoid Ollama model swaps.
+
+    Calls for the currently loaded model are drained first. After
+    `max_consecutive` calls in a row, if another model has work waiting,
+    the scheduler switches to the model whose oldest call has waited longest,
+    so no file is starved behind a long queue.
+    """
+
+    def __init__(
+        self,
+        max_consecutive: int = DEFAULT_MAX_CONSECUTIVE,
+        load_model: Callable[[str], None] = load_model_with_ollama,
+    ):
+        if max_consecutive < 1:
+            raise ValueError("max_consecutive must be >= 1")
+        self.max_consecutive = max_consecutive
+        self.load_model = load_model
+        self.queues: Dict[str, deque] = {}
+        self.current_model: Optional[str] = None
+        self.consecutive = 0
+        self.stats: Dict[str, Any] = {
+            "model_loads": 0,
+            "model_swaps": 0,
+            "model_load_seconds": 0.0,
+            "calls_per_model": {},
+            "load_seconds_per_model": {},
+        }
+
+    def submit(self, model: str, fn: Callable[[], Any], on_done: Callable[[Any], None]) -> None:
+        """Queue `fn()` to run on `model`; `on_done` receives its result."""
+        self.queues.setdefault(model, deque()).append(
+            {"fn": fn, "on_done": on_done, "enqueued_at": time.perf_counter()}
+        )
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def _pick_model(self) -> str:
+        waiting = [m for m, q in self.queues.items() if q]
+        current = self.current_model
+        if current in waiting:
+            others = [m for m in waiting if m != current]
+            if not others or self.consecutive < self.max_consecutive:
+                return current
+            waiting = others
+        # Oldest waiting call wins
+        return min(waiting, key=lambda m: self.queues[m][0]["enqueued_at"])
+
+    def _switch_to(self, model: str) -> None:
+        start = time.perf_counter()
+        self.load_model(model)
+        elapsed = time.perf_counter() - start
+
+        if self.current_model is not None:
+            self.stats["model_swaps"] += 1
+        self.stats["model_loads"] += 1
+        self.stats["model_load_seconds"] += elapsed
+        per_model = self.stats["load_seconds_per_model"]
+        per_model[model] = per_model.get(model, 0.0) + elapsed
+
+        self.current_model = model
+        self.consecutive = 0
+
+    def run(self) -> Dict[str, Any]:
+        """Drain all queues (including calls submitted by callbacks) and return stats."""
+        start = time.perf_counter()
+        while self.pending():
+            model = self._pick_model()
+            if model != self.current_model:
+                self._switch_to(model)
+
+            job = self.queues[model].popleft()
+            self.consecutive += 1
+            calls = self.stats["calls_per_model"]
+            calls[model] = calls.get(model, 0) + 1
+
+            job["on_done"](job["fn"]())
+
+        self.stats["wall_seconds"] = time.perf_counter() - start
+        return self.stats
+
+
+# ---------- 3. Batch pipeline ----------
+
+def run_batch_pipeline(
+    code_paths: List[Path],
+    models: Optional[Dict[str, str]] = None,
+    mode: str = "quick",
+    max_consecutive: int = DEFAULT_MAX_CONSECUTIVE,
+    load_model: Callable[[str], None] = load_model_with_ollama,
+    save: bool = True,
+) -> Dict[str, Any]:
+    """
+    Review many files with the A -> B -> C pipeline, scheduling stage calls by model.
+
+    `models` maps "agent_a" / "agent_b" / "agent_c" to an Ollama model name.
+    Returns {"files": {path: {...}}, "stats": {...}} where each file entry holds
+    the agent results (or "error"), its latency and, if `save`, the output paths.
+    """
+    stage_models = {**DEFAULT_STAGE_MODELS, **(models or {})}
+    scheduler = ModelAffinityScheduler(max_consecutive=max_consecutive, load_model=load_model)
+    files: Dict[str, Dict[str, Any]] = {}
+
+    def _finish(entry: Dict[str, Any]) -> None:
+        entry["latency_seconds"] = time.perf_counter() - entry.pop("_started")
+
+    def _submit(
+        entry: Dict[str, Any],
+        model: str,
+        step: Callable[[], Any],
+        on_done: Callable[[Any], None],
+    ) -> None:
+        # One failing file must not abort the whole batch: an error in the stage
+        # call or in its callback is recorded on that file's entry
+        def call():
+            try:
+                return step()
+            except Exception as exc:
+                entry["error"] = f"{type(exc).__name__}: {exc}"
+                return None
+
+        def done(result):
+            try:
+                on_done(result)
+            except Exception as exc:
+                entry["error"] = f"{type(exc).__name__}: {exc}"
+                if "_started" in entry:
+                    _finish(entry)
+
+        scheduler.submit(model, call, done)
+
+    def start_file(path: Path) -> None:
+        entry: Dict[str, Any] = {"_started": time.perf_counter()}
+        files[str(path)] = entry
+        try:
+            code = load_code(str(path))
+        except Exception as exc:
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+            return _finish(entry)
+
+        def after_c(c_result):
+            if c_result is None:
+                return _finish(entry)
+            entry["agent_c"] = c_result
+            if save:
+                entry["outputs"] = save_pipeline_outputs(
+                    entry["agent_a_raw"],
+                    entry["agent_a_refined"],
+                    entry["agent_b"],
+                    c_result,
+                    prefix=output_prefix(path),
+                )
+            _finish(entry)
+
+        def after_b(b_result):
+            if b_result is None:
+                return _finish(entry)
+            entry["agent_b"] = b_result
+            _submit(
+                entry,
+                stage_models["agent_c"],
+                lambda: run_agent_c_reporter(b_result, code, model=stage_models["agent_c"]),
+                after_c,
+            )
+
+        def after_a(a_result):
+            if a_result is None:
+                return _finish(entry)
+            entry["agent_a_raw"] = a_result
+            a_refined = refine_categories_from_code(code, a_result)
+            entry["agent_a_refined"] = a_refined
+            selected_categories = a_refined.get("selected_rule_categories", [])
+            _submit(
+                entry,
+                stage_models["agent_b"],
+                lambda: run_agent_b_review(
+                    code=code,
+                    selected_categories=selected_categories,
+                    mode=mode,
+                    model=stage_models["agent_b"],
+                ),
+                after_b,
+            )
+
+        _submit(
+            entry,
+            stage_models["agent_a"],
+            lambda: run_agent_a_analyze_and_select(code, model=stage_models["agent_a"]),
+            after_a,
+        )
+
+    for path in code_paths:
+        start_file(Path(path))
+
+    stats = scheduler.run()
+    return {"files": files, "stats": stats}
+
+
+# ---------- 4. CLI ----------
+
+if __name__ == "__main__":
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(Path("samples").glob("*.cpp"))
+    result = run_batch_pipeline(paths)
+
+    print("=== Batch complete ===")
+    for path, entry in result["files"].items():
+        status = entry.get("error") or "ok"
+        print(f"{path}: {status} ({entry['latency_seconds']:.1f}s)")
+
+    stats = result["stats"]
+    print(f"Model loads   -> {stats['model_loads']} ({stats['model_swaps']} swaps)")
+    print(f"Load time     -> {stats['model_load_seconds']:.1f}s of {stats['wall_seconds']:.1f}s")
+    print(f"Calls/model   -> {stats['calls_per_model']}")
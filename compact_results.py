@@ -0,0 +1,442 @@
+import json
+from array import array
+from collections import Counter
+from enum import IntEnum
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+
+# ---------- 1. Codes ----------
+
+class Status(IntEnum):
+    """per_rule_status[].status, one byte per verdict."""
+    OTHER = 0  # raw value kept in the row's extras
+    PASS = 1
+    FAIL = 2
+    NOT_APPLICABLE = 3
+    PENDING = 4  # deadline mode (see deadline_review.py)
+
+
+class Severity(IntEnum):
+    """Rule / violation severity, one byte per verdict."""
+    MISSING = 0  # no "severity" key (or raw value kept in the row's extras)
+    ERROR = 1
+    WARNING = 2
+    INFO = 3
+
+
+STATUS_NAMES = {
+    Status.PASS: "pass",
+    Status.FAIL: "fail",
+    Status.NOT_APPLICABLE: "not_applicable",
+    Status.PENDING: "pending",
+}
+SEVERITY_NAMES = {
+    Severity.ERROR: "Error",
+    Severity.WARNING: "Warning",
+    Severity.INFO: "Info",
+}
+_STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+_SEVERITY_CODES = {name: code for code, name in SEVERITY_NAMES.items()}
+
+
+def _encode(codes: Dict[str, IntEnum], value: Any, default: IntEnum) -> IntEnum:
+    return codes.get(value, default) if isinstance(value, str) else default
+
+
+SUMMARY_FIELDS = (
+    "errors",
+    "warnings",
+    "info",
+    "rules_checked",
+    "rules_failed",
+    "rules_passed",
+    "rules_not_applicable",
+)
+
+# Bits of CompactResults.f_flags
+HAS_PER_RULE_STATUS = 1
+HAS_VIOLATIONS = 2
+
+_STATUS_KEYS = ("rule_id", "status", "severity")
+_VIOLATION_KEYS = (
+    "rule_id",
+    "severity",
+    "section",
+    "line_range",
+    "violation_description",
+    "suggested_fix",
+)
+
+
+# ---------- 2. Interning ----------
+
+class StringTable:
+    """Store each distinct string once and refer to it by index."""
+
+    __slots__ = ("strings", "_index")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            self._index[value] = idx
+            self.strings.append(value)
+        return idx
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.strings[idx]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+# ---------- 3. Violation records ----------
+
+class Violation:
+    """One Agent B violation; repeated strings (rule_id, section) are interned indices."""
+
+    __slots__ = (
+        "file_idx",
+        "rule_idx",
+        "severity",
+        "section_idx",
+        "line_start",
+        "line_end",
+        "description",
+        "suggested_fix",
+        "missing",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        file_idx: int,
+        rule_idx: int,
+        severity: Severity,
+        section_idx: int,
+        line_start: int,
+        line_end: int,
+        description: Optional[str],
+        suggested_fix: Optional[str],
+        missing: Tuple[str, ...] = (),
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.file_idx = file_idx
+        self.rule_idx = rule_idx
+        self.severity = severity
+        self.section_idx = section_idx
+        self.line_start = line_start
+        self.line_end = line_end
+        self.description = description
+        self.suggested_fix = suggested_fix
+        self.missing = missing  # schema keys absent from the original dict
+        self.extra = extra  # anything that does not fit the columns above, kept verbatim
+
+
+# ---------- 4. Columnar result set ----------
+
+class CompactResults:
+    """
+    Agent B results for many files in array-backed columns.
+
+    Verdicts are stored file-major as parallel arrays (file, rule, status,
+    severity) with one row per per_rule_status entry; rule IDs and sections are
+    interned. Anything outside the known schema is kept in small per-row
+    "extras" dicts, so to_agent_b_json() returns exactly what was added.
+    """
+
+    def __init__(self):
+        self.files = StringTable()
+        self.rules = StringTable()
+        self.sections = StringTable()
+        self.modes = StringTable()
+
+        # Verdict columns (one row per per_rule_status entry)
+        self.v_file = array("I")
+        self.v_rule = array("I")
+        self.v_status = array("B")
+        self.v_severity = array("B")
+
+        # Per-file columns; verdict / violation rows of file i are [offset[i], offset[i + 1])
+        self.f_mode = array("i")  # -1 = no "mode" key
+        self.f_summary = array("l")  # len(SUMMARY_FIELDS) values per file, -1 = not columnar
+        self.f_flags = array("B")  # HAS_PER_RULE_STATUS | HAS_VIOLATIONS
+        self.f_verdict_offset = array("I", [0])
+        self.f_violation_offset = array("I", [0])
+
+        self.violations: List[Violation] = []
+
+        # Rare leftovers, keyed by file index / verdict row
+        self._file_extra: Dict[int, Dict[str, Any]] = {}
+        self._verdict_extra: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    # ----- building -----
+
+    def add_result(self, file_id: str, b_result: Dict[str, Any]) -> int:
+        """Append one Agent B result; returns the file index."""
+        if self.files.lookup(file_id) is not None:
+            raise ValueError(f"Duplicate file in compact results: {file_id}")
+        file_idx = self.files.intern(file_id)
+        extra: Dict[str, Any] = {}
+        flags = 0
+
+        mode = b_result.get("mode")
+        if isinstance(mode, str):
+            self.f_mode.append(self.modes.intern(mode))
+        else:
+            self.f_mode.append(-1)
+            if "mode" in b_result:
+                extra["mode"] = mode
+
+        summary = b_result.get("summary")
+        if (
+            isinstance(summary, dict)
+            and set(summary) == set(SUMMARY_FIELDS)
+            and all(type(summary[k]) is int and summary[k] >= 0 for k in SUMMARY_FIELDS)
+        ):
+            self.f_summary.extend(summary[k] for k in SUMMARY_FIELDS)
+        else:
+            self.f_summary.extend([-1] * len(SUMMARY_FIELDS))
+            if "summary" in b_result:
+                extra["summary"] = summary
+
+        statuses = b_result.get("per_rule_status")
+        if isinstance(statuses, list) and all(self._is_columnar_status(s) for s in statuses):
+            for s in statuses:
+                self._add_verdict(file_idx, s)
+            flags |= HAS_PER_RULE_STATUS
+        elif "per_rule_status" in b_result:
+            extra["per_rule_status"] = statuses
+
+        violations = b_result.get("violations")
+        if isinstance(violations, list) and all(isinstance(v, dict) for v in violations):
+            for v in violations:
+                self._add_violation(file_idx, v)
+            flags |= HAS_VIOLATIONS
+        elif "violations" in b_result:
+            extra["violations"] = violations
+
+        for key, value in b_result.items():
+            if key not in ("mode", "summary", "per_rule_status", "violations"):
+                extra[key] = value
+        if extra:
+            self._file_extra[file_idx] = extra
+
+        self.f_flags.append(flags)
+        self.f_verdict_offset.append(len(self.v_file))
+        self.f_violation_offset.append(len(self.violations))
+        return file_idx
+
+    @staticmethod
+    def _is_columnar_status(s: Any) -> bool:
+        return isinstance(s, dict) and isinstance(s.get("rule_id"), str)
+
+    def _add_verdict(self, file_idx: int, s: Dict[str, Any]) -> None:
+        row = len(self.v_file)
+        extra = {k: v for k, v in s.items() if k not in _STATUS_KEYS}
+
+        status = _encode(_STATUS_CODES, s.get("status"), Status.OTHER)
+        if status is Status.OTHER and "status" in s:
+            extra["status"] = s["status"]
+        severity = _encode(_SEVERITY_CODES, s.get("severity"), Severity.MISSING)
+        if severity is Severity.MISSING and "severity" in s:
+            extra["severity"] = s["severity"]
+
+        self.v_file.append(file_idx)
+        self.v_rule.append(self.rules.intern(s["rule_id"]))
+        self.v_status.append(status)
+        self.v_severity.append(severity)
+        if extra:
+            self._verdict_extra[row] = extra
+
+    def _add_violation(self, file_idx: int, v: Dict[str, Any]) -> None:
+        # Schema keys with an unexpected type, and unknown keys, go to extras verbatim
+        extra = {k: val for k, val in v.items() if k not in _VIOLATION_KEYS}
+        rule_id = v.get("rule_id")
+        if "rule_id" in v and not isinstance(rule_id, str):
+            extra["rule_id"] = rule_id
+        section = v.get("section")
+        if "section" in v and not isinstance(section, str):
+            extra["section"] = section
+        severity = _encode(_SEVERITY_CODES, v.get("severity"), Severity.MISSING)
+        if severity is Severity.MISSING and "severity" in v:
+            extra["severity"] = v["severity"]
+        line_range = v.get("line_range")
+        if (
+            isinstance(line_range, list)
+            and len(line_range) == 2
+            and all(type(n) is int for n in line_range)
+        ):
+            line_start, line_end = line_range
+        else:
+            line_start = line_end = -1
+            if "line_range" in v:
+                extra["line_range"] = line_range
+        for key in ("violation_description", "suggested_fix"):
+            if key in v and not isinstance(v[key], str):
+                extra[key] = v[key]
+
+        self.violations.append(
+            Violation(
+                file_idx=file_idx,
+                rule_idx=self.rules.intern(rule_id) if isinstance(rule_id, str) else -1,
+                severity=severity,
+                section_idx=self.sections.intern(section) if isinstance(section, str) else -1,
+                line_start=line_start,
+                line_end=line_end,
+                description=v.get("violation_description"),
+                suggested_fix=v.get("suggested_fix"),
+                missing=tuple(k for k in _VIOLATION_KEYS if k not in v),
+                extra=extra or None,
+            )
+        )
+
+    @classmethod
+    def from_agent_b_results(cls, results: Iterable[Tuple[str, Dict[str, Any]]]) -> "CompactResults":
+        """Build from (file_id, Agent B result) pairs."""
+        compact = cls()
+        for file_id, b_result in results:
+            compact.add_result(file_id, b_result)
+        return compact
+
+    @classmethod
+    def from_agent_b_files(cls, paths: Iterable[Path]) -> "CompactResults":
+        """Build from saved agent_b_result_*.json files, keyed by path."""
+        return cls.from_agent_b_results(
+            (str(p), json.loads(Path(p).read_text(encoding="utf-8"))) for p in paths
+        )
+
+    # ----- converting back -----
+
+    def _verdict_json(self, row: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"rule_id": self.rules[self.v_rule[row]]}
+        status = self.v_status[row]
+        if status != Status.OTHER:
+            out["status"] = STATUS_NAMES[Status(status)]
+        severity = self.v_severity[row]
+        if severity != Severity.MISSING:
+            out["severity"] = SEVERITY_NAMES[Severity(severity)]
+        out.update(self._verdict_extra.get(row, {}))
+        return out
+
+    def _violation_json(self, v: Violation) -> Dict[str, Any]:
+        extra = v.extra or {}
+        out: Dict[str, Any] = {}
+        for key in _VIOLATION_KEYS:
+            if key in v.missing or key in extra:
+                continue
+            if key == "rule_id":
+                out[key] = self.rules[v.rule_idx]
+            elif key == "severity":
+                out[key] = SEVERITY_NAMES[v.severity]
+            elif key == "section":
+                out[key] = self.sections[v.section_idx]
+            elif key == "line_range":
+                out[key] = [v.line_start, v.line_end]
+            elif key == "violation_description":
+                out[key] = v.description
+            else:
+                out[key] = v.suggested_fix
+        out.update(extra)
+        return out
+
+    def to_agent_b_json(self, file_id: str) -> Dict[str, Any]:
+        """Rebuild the original Agent B result dict for `file_id`."""
+        file_idx = self.files.lookup(file_id)
+        if file_idx is None:
+            raise KeyError(file_id)
+        extra = self._file_extra.get(file_idx, {})
+        out: Dict[str, Any] = {}
+
+        if self.f_mode[file_idx] >= 0:
+            out["mode"] = self.modes[self.f_mode[file_idx]]
+
+        width = len(SUMMARY_FIELDS)
+        summary = self.f_summary[file_idx * width:(file_idx + 1) * width]
+        if summary[0] >= 0:
+            out["summary"] = dict(zip(SUMMARY_FIELDS, summary))
+
+        # Schema order (mode, summary, violations, per_rule_status), so json.dumps
+        # reproduces the saved files byte-for-byte
+        start, end = self.f_violation_offset[file_idx], self.f_violation_offset[file_idx + 1]
+        if self.f_flags[file_idx] & HAS_VIOLATIONS:
+            out["violations"] = [self._violation_json(v) for v in self.violations[start:end]]
+
+        rows = range(self.f_verdict_offset[file_idx], self.f_verdict_offset[file_idx + 1])
+        if self.f_flags[file_idx] & HAS_PER_RULE_STATUS:
+            out["per_rule_status"] = [self._verdict_json(row) for row in rows]
+
+        out.update(extra)
+        return out
+
+    def iter_agent_b_json(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        for file_id in self.files.strings:
+            yield file_id, self.to_agent_b_json(file_id)
+
+    # ----- aggregation -----
+
+    def status_counts_by_rule(self) -> Dict[str, Dict[str, int]]:
+        """{rule_id: {"pass": n, "fail": n, ...}} across all files."""
+        counts: Dict[str, Dict[str, int]] = {}
+        for (rule_idx, status), n in Counter(zip(self.v_rule, self.v_status)).items():
+            name = STATUS_NAMES.get(Status(status), "other")
+            per_rule = counts.setdefault(self.rules[rule_idx], {})
+            per_rule[name] = per_rule.get(name, 0) + n
+        return counts
+
+    def top_failing_rules(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The `n` rules failing in the most files, as (rule_id, count)."""
+        fails = Counter(
+            rule_idx for rule_idx, status in zip(self.v_rule, self.v_status)
+            if status == Status.FAIL
+        )
+        return [(self.rules[idx], count) for idx, count in fails.most_common(n)]
+
+    def files_failing(self, rule_id: str) -> List[str]:
+        """Files in which `rule_id` has status "fail"."""
+        rule_idx = self.rules.lookup(rule_id)
+        if rule_idx is None:
+            return []
+        return [
+            self.files[file_idx]
+            for file_idx, r, status in zip(self.v_file, self.v_rule, self.v_status)
+            if r == rule_idx and status == Status.FAIL
+        ]
+
+    def failures_per_file(self) -> Dict[str, int]:
+        """{file_id: number of failed rules}, including files with none."""
+        fails = Counter(
+            file_idx for file_idx, status in zip(self.v_file, self.v_status)
+            if status == Status.FAIL
+        )
+        return {file_id: fails.get(idx, 0) for idx, file_id in enumerate(self.files.strings)}
+
+    def violations_by_severity(self) -> Dict[str, int]:
+        """{"Error": n, "Warning": n, "Info": n} over all violations."""
+        counts = Counter(v.severity for v in self.violations)
+        return {name: counts.get(code, 0) for code, name in SEVERITY_NAMES.items()}
+
+    def summary_totals(self) -> Dict[str, int]:
+        """Agent B-style summary block recomputed over every file."""
+        statuses = Counter(self.v_status)
+        severities = self.violations_by_severity()
+        return {
+            "errors": severities["Error"],
+            "warnings": severities["Warning"],
+            "info": severities["Info"],
+            "rules_checked": len(self.v_status) - statuses.get(Status.PENDING, 0),
+            "rules_failed": statuses.get(Status.FAIL, 0),
+            "rules_passed": statuses.get(Status.PASS, 0),
+            "rules_not_applicable": statuses.get(Status.NOT_APPLICABLE, 0),
+        }
@@ -0,0 +1,8 @@
+# Settings shared by review_daemon.py and review_client.py.
+# Standard library only: the client imports this and must start instantly.
+
+HOST = "127.0.0.1"  # local only
+DEFAULT_PORT = 8765
+DEFAULT_PRIORITY = 10  # lower runs sooner; editors can send 0
+
+DAEMON_URL = f"http://{HOST}:{DEFAULT_PORT}"
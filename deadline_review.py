@@ -0,0 +1,254 @@
+import copy
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import agent_a_analyzer
+import agent_b_reviewer
+from agent_a_analyzer import run_agent_a_analyze_and_select, load_code
+from agent_b_reviewer import (
+    GUIDELINES_INDEX,
+    NOT_APPLICABLE_UNLESS,
+    decide_rules_locally,
+    refine_categories_from_code,
+    run_agent_b_review,
+    select_rules_by_categories,
+)
+from review_cache import cache_key, cache_get, cache_put
+from run_full_pipeline import output_prefix
+
+
+# ---------- 1. Config ----------
+
+OUTPUT_DIR = Path("outputs")
+DEFAULT_DEADLINE_SECONDS = 5.0
+
+PENDING = "pending"
+
+
+# ---------- 2. Result snapshots ----------
+
+def _summarize(per_rule_status: List[Dict[str, Any]], violations: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Recompute Agent B's summary block, plus a count of rules still pending."""
+    statuses = [s.get("status") for s in per_rule_status]
+    severities = [v.get("severity") for v in violations]
+    return {
+        "errors": severities.count("Error"),
+        "warnings": severities.count("Warning"),
+        "info": severities.count("Info"),
+        "rules_checked": len(statuses) - statuses.count(PENDING),
+        "rules_failed": statuses.count("fail"),
+        "rules_passed": statuses.count("pass"),
+        "rules_not_applicable": statuses.count("not_applicable"),
+        "rules_pending": statuses.count(PENDING),
+    }
+
+
+def _partial_result(mode: str, rules: List[Dict[str, Any]], decided: Dict[str, str]) -> Dict[str, Any]:
+    """Agent B-shaped result where every rule not in `decided` is marked pending."""
+    per_rule_status = [
+        {
+            "rule_id": r.get("rule_id"),
+            "status": decided.get(r.get("rule_id"), PENDING),
+            "severity": r.get("severity"),
+        }
+        for r in rules
+    ]
+    return {
+        "mode": mode,
+        "summary": _summarize(per_rule_status, []),
+        "violations": [],
+        "per_rule_status": per_rule_status,
+        "complete": False,
+        "pending_rules": [s["rule_id"] for s in per_rule_status if s["status"] == PENDING],
+    }
+
+
+def _merged_result(
+    mode: str,
+    rules: List[Dict[str, Any]],
+    decided: Dict[str, str],
+    b_result: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Final result over `rules`: Agent B's verdicts, then local decisions.
+    Rules Agent B left out stay "pending" (and in "pending_rules"), so the
+    result is only "complete" when every rule has a verdict.
+    """
+    llm_status = {
+        s.get("rule_id"): s for s in b_result.get("per_rule_status", []) if isinstance(s, dict)
+    }
+    per_rule_status = []
+    for r in rules:
+        rule_id = r.get("rule_id")
+        if rule_id in llm_status:
+            per_rule_status.append(llm_status[rule_id])
+        else:
+            per_rule_status.append(
+                {
+                    "rule_id": rule_id,
+                    "status": decided.get(rule_id, PENDING),
+                    "severity": r.get("severity"),
+                }
+            )
+    violations = b_result.get("violations", [])
+    pending_rules = [s["rule_id"] for s in per_rule_status if s.get("status") == PENDING]
+    return {
+        "mode": b_result.get("mode", mode),
+        "summary": _summarize(per_rule_status, violations),
+        "violations": violations,
+        "per_rule_status": per_rule_status,
+        "complete": not pending_rules,
+        "pending_rules": pending_rules,
+    }
+
+
+# ---------- 3. Deadline-bounded review ----------
+
+def run_deadline_review(
+    code_path: Path,
+    deadline_seconds: Optional[float] = DEFAULT_DEADLINE_SECONDS,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    mode: str = "quick",
+    result_path: Optional[Path] = None,
+    daemon: bool = False,
+) -> Dict[str, Any]:
+    """
+    Review a file within `deadline_seconds`, then keep filling in verdicts.
+
+    Returns at the deadline (or as soon as the review completes) with whatever
+    is known: cached results, rules decided locally as not_applicable, and any
+    LLM verdicts that arrived in time. Undecided rules have status "pending" and
+    are listed in "pending_rules"; "complete" tells whether anything is left, and
+    "finished" whether more updates will come (rules Agent B skipped stay
+    pending in the final, finished result).
+
+    The LLM stages keep running in a background thread. Each new snapshot is
+    passed to `on_update` and written to `result_path`
+    (default: outputs/<path prefix>agent_b_progressive.json). Agent C is not run.
+    With `daemon=True` the thread does not keep the process alive: a short-lived
+    caller that exits after the deadline abandons the rest (see the CLI below).
+    `deadline_seconds=None` waits for the full review.
+    """
+    code_path = Path(code_path)
+    code = load_code(str(code_path))
+    result_path = result_path or OUTPUT_DIR / f"{output_prefix(code_path)}agent_b_progressive.json"
+
+    a_key = cache_key("agent_a", code=code, model=agent_a_analyzer.MODEL)
+    final_key = cache_key(
+        "deadline",
+        code=code,
+        mode=mode,
+        model_a=agent_a_analyzer.MODEL,
+        model=agent_b_reviewer.MODEL,
+        local_rules=NOT_APPLICABLE_UNLESS,
+    )
+
+    lock = threading.Lock()
+    done = threading.Event()
+    state: Dict[str, Any] = {}
+
+    def publish(result: Dict[str, Any]) -> None:
+        with lock:
+            state["result"] = result
+        result_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = result_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(result_path)
+        if on_update is not None:
+            on_update(copy.deepcopy(result))
+
+    cached = cache_get(final_key)
+    if cached is not None:
+        result = {**cached, "finished": True}
+        publish(result)
+        return copy.deepcopy(result)
+
+    # Before Agent A has selected categories every rule is a candidate
+    publish(
+        {
+            **_partial_result(mode, GUIDELINES_INDEX, decide_rules_locally(code, GUIDELINES_INDEX)),
+            "finished": False,
+        }
+    )
+
+    def worker() -> None:
+        try:
+            a_result = cache_get(a_key)
+            if a_result is None:
+                a_result = run_agent_a_analyze_and_select(code)
+                cache_put(a_key, a_result)
+            a_refined = refine_categories_from_code(code, a_result)
+            selected_categories = a_refined.get("selected_rule_categories", [])
+
+            rules = select_rules_by_categories(selected_categories)
+            decided = decide_rules_locally(code, rules)
+            publish({**_partial_result(mode, rules, decided), "finished": False})
+
+            # Only rules not already decided locally go to the LLM
+            undecided = [r for r in rules if r.get("rule_id") not in decided]
+            b_result: Dict[str, Any] = {}
+            if undecided:
+                b_result = run_agent_b_review(
+                    code=code,
+                    selected_categories=selected_categories,
+                    mode=mode,
+                    rules=undecided,
+                )
+            final = _merged_result(mode, rules, decided, b_result)
+            if final["complete"]:
+                cache_put(final_key, final)
+            publish({**final, "finished": True})
+        except Exception as exc:
+            with lock:
+                failed = {**state["result"], "finished": True, "error": f"{type(exc).__name__}: {exc}"}
+            publish(failed)
+        finally:
+            done.set()
+
+    threading.Thread(target=worker, name=f"deadline-review-{code_path.stem}", daemon=daemon).start()
+    done.wait(deadline_seconds)
+
+    with lock:
+        return copy.deepcopy(state["result"])
+
+
+def finish_in_background(code_path: Path, mode: str = "quick") -> None:
+    """
+    Complete the review of `code_path` in a detached process, so the caller
+    (a hook or editor command) can exit at its deadline. Stages already cached
+    by the caller are not redone; the result file keeps being updated.
+    """
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--finish", str(code_path), mode],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+# ---------- 4. CLI ----------
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--finish":
+        # Detached run started by finish_in_background(); waits for the full review
+        run_deadline_review(Path(sys.argv[2]), deadline_seconds=None, mode=sys.argv[3])
+        sys.exit(0)
+
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("samples/example1.cpp")
+    deadline = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DEADLINE_SECONDS
+
+    # The in-process review is abandoned at exit; a detached process finishes it
+    snapshot = run_deadline_review(path, deadline, daemon=True)
+    summary = snapshot["summary"]
+    print("=== Review snapshot ===")
+    print(f"Complete      -> {snapshot['complete']}")
+    print(f"Failed rules  -> {summary['rules_failed']}")
+    print(f"Pending rules -> {len(snapshot['pending_rules'])}")
+    if not snapshot["finished"]:
+        finish_in_background(path)
+        print("Remaining verdicts will be written to outputs/ as they arrive.")
@@ -0,0 +1,12 @@
+#include <iostream>
+
+int addValues(int first, int second)
+{
+    return first + second;
+}
+
+int main()
+{
+    std::cout << addValues(2, 3) << '\n';
+    return 0;
+}
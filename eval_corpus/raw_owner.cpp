@@ -0,0 +1,25 @@
+#include <cstddef>
+
+class Matrix
+{
+public:
+    Matrix(std::size_t rows, std::size_t cols) : m_rows(rows), m_cols(cols)
+    {
+        m_data = new double[rows * cols];
+    }
+
+    ~Matrix()
+    {
+        delete[] m_data;
+    }
+
+    double GetAt(std::size_t row, std::size_t col) const
+    {
+        return m_data[row * m_cols + col];
+    }
+
+private:
+    std::size_t m_rows;
+    std::size_t m_cols;
+    double *m_data;
+};
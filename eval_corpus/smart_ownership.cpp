@@ -0,0 +1,27 @@
+#include <memory>
+#include <vector>
+#include <iostream>
+
+class Buffer
+{
+public:
+    explicit Buffer(std::size_t size) : m_values(size, 0) {}
+
+    void printValues() const
+    {
+        for (int value : m_values)
+        {
+            std::cout << value << '\n';
+        }
+    }
+
+private:
+    std::vector<int> m_values;
+};
+
+int main()
+{
+    std::unique_ptr<Buffer> buffer = std::make_unique<Buffer>(4);
+    buffer->printValues();
+    return 0;
+}
@@ -0,0 +1,325 @@
+import json
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.prompts import ChatPromptTemplate
+
+import agent_a_analyzer
+import agent_b_reviewer
+from agent_a_analyzer import run_agent_a_analyze_and_select, load_code
+from agent_b_reviewer import (
+    REVIEWER_SYSTEM_PROMPT,
+    REVIEWER_HUMAN_PROMPT,
+    refine_categories_from_code,
+    run_agent_b_review,
+)
+from batch_scheduler import load_model_with_ollama
+from llm_clients import ollama_chat
+
+
+# ---------- 1. Config ----------
+
+LABELS_PATH = Path("eval_corpus/labels.json")
+OUTPUT_DIR = Path("outputs")
+
+# Models from the README "Recommended Models" table
+DEFAULT_MODELS = [
+    "qwen2.5-coder:3b",
+    "qwen3:4b-instruct",
+    "qwen2.5:14b-instruct",
+]
+DEFAULT_MODES = ["quick", "full"]
+
+
+# ---------- 2. Prompt variants ----------
+
+def _without_examples(system_prompt: str) -> str:
+    """Drop the worked examples block from the reviewer system prompt."""
+    start = system_prompt.index("Examples:")
+    end = system_prompt.index("### QUICK vs FULL MODE")
+    return system_prompt[:start] + system_prompt[end:]
+
+
+# Reviewer prompt per variant (None = agent_b_reviewer.reviewer_prompt)
+PROMPT_VARIANTS: Dict[str, Optional[ChatPromptTemplate]] = {
+    "default": None,
+    "no_examples": ChatPromptTemplate.from_messages(
+        [
+            ("system", _without_examples(REVIEWER_SYSTEM_PROMPT)),
+            ("human", REVIEWER_HUMAN_PROMPT),
+        ]
+    ),
+}
+
+
+# ---------- 3. Backends ----------
+
+def ollama_backend(model: str, num_predict: int):
+    """Default backend: a ChatOllama client configured like the agents' own."""
+    return ollama_chat(model, num_predict)
+
+
+class UsageRecorder(BaseCallbackHandler):
+    """Sum input/output tokens reported by the chat model on every call."""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.calls = 0
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        self.calls += 1
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.output_tokens += usage.get("output_tokens", 0)
+
+
+# ---------- 4. Corpus ----------
+
+def load_labeled_corpus(path: Path = LABELS_PATH) -> List[Dict[str, Any]]:
+    """
+    Load the labeled corpus: a JSON list of
+    {"case_id": str, "code_path": str, "expected": {rule_id: "pass"|"fail"|"not_applicable"}}.
+    """
+    cases = json.loads(Path(path).read_text(encoding="utf-8"))
+    for case in cases:
+        case["code"] = load_code(case["code_path"])
+    return cases
+
+
+def default_configurations(models: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Every model (default: the README models) x mode with every prompt variant."""
+    return [
+        {"model": model, "mode": mode, "prompt_variant": variant}
+        for model in models or DEFAULT_MODELS
+        for mode in DEFAULT_MODES
+        for variant in PROMPT_VARIANTS
+    ]
+
+
+# ---------- 5. Scoring ----------
+
+def _ratio(num: int, den: int) -> Optional[float]:
+    return num / den if den else None
+
+
+def score_case(expected: Dict[str, str], predicted: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """
+    Count per-rule outcomes, treating "fail" (a violation) as the positive class.
+    Rules the model did not report count as not flagged.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    for rule_id, want in expected.items():
+        got = predicted.get(rule_id)
+        c = counts.setdefault(rule_id, {"tp": 0, "fp": 0, "fn": 0, "correct": 0, "total": 0})
+        c["total"] += 1
+        c["correct"] += int(got == want)
+        if got == "fail" and want == "fail":
+            c["tp"] += 1
+        elif got == "fail":
+            c["fp"] += 1
+        elif want == "fail":
+            c["fn"] += 1
+    return counts
+
+
+def _merge_counts(into: Dict[str, Dict[str, int]], counts: Dict[str, Dict[str, int]]) -> None:
+    for rule_id, c in counts.items():
+        acc = into.setdefault(rule_id, {"tp": 0, "fp": 0, "fn": 0, "correct": 0, "total": 0})
+        for key, value in c.items():
+            acc[key] += value
+
+
+def _metrics(c: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        **c,
+        "precision": _ratio(c["tp"], c["tp"] + c["fp"]),
+        "recall": _ratio(c["tp"], c["tp"] + c["fn"]),
+        "accuracy": _ratio(c["correct"], c["total"]),
+    }
+
+
+# ---------- 6. Evaluation ----------
+
+def evaluate_configuration(
+    config: Dict[str, Any],
+    cases: List[Dict[str, Any]],
+    backend: Callable[[str, int], Any] = ollama_backend,
+    load_model: Optional[Callable[[str], None]] = load_model_with_ollama,
+) -> Dict[str, Any]:
+    """
+    Run Agent A -> refine -> Agent B on every case under one configuration.
+
+    Agent C is skipped: it only reformats Agent B's verdicts, so it does not
+    change accuracy and would only add noise to the latency numbers.
+    The model is loaded with `load_model` before the timed cases, so load time
+    is reported separately; pass None for backends that are not Ollama.
+    """
+    model = config["model"]
+    warm_up_seconds = 0.0
+    if load_model is not None:
+        start = time.perf_counter()
+        load_model(model)
+        warm_up_seconds = time.perf_counter() - start
+
+    prompt = PROMPT_VARIANTS[config.get("prompt_variant", "default")]
+    usage = UsageRecorder()
+    llm_a = backend(model, agent_a_analyzer.NUM_PREDICT).with_config(callbacks=[usage])
+    llm_b = backend(model, agent_b_reviewer.NUM_PREDICT).with_config(callbacks=[usage])
+
+    counts: Dict[str, Dict[str, int]] = {}
+    case_results: List[Dict[str, Any]] = []
+    total_seconds = 0.0
+
+    for case in cases:
+        start = time.perf_counter()
+        error = None
+        predicted: Dict[str, str] = {}
+        try:
+            a_result = run_agent_a_analyze_and_select(case["code"], llm=llm_a)
+            a_refined = refine_categories_from_code(case["code"], a_result)
+            b_result = run_agent_b_review(
+                code=case["code"],
+                selected_categories=a_refined.get("selected_rule_categories", []),
+                mode=config["mode"],
+                llm=llm_b,
+                prompt=prompt,
+            )
+            predicted = {
+                s.get("rule_id"): s.get("status") for s in b_result.get("per_rule_status", [])
+            }
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - start
+        total_seconds += elapsed
+
+        case_counts = score_case(case["expected"], predicted)
+        _merge_counts(counts, case_counts)
+        case_results.append(
+            {
+                "case_id": case["case_id"],
+                "latency_seconds": elapsed,
+                "predicted": predicted,
+                "error": error,
+            }
+        )
+
+    overall = {"tp": 0, "fp": 0, "fn": 0, "correct": 0, "total": 0}
+    for c in counts.values():
+        for key, value in c.items():
+            overall[key] += value
+
+    return {
+        "config": config,
+        "cases": case_results,
+        "errors": sum(1 for r in case_results if r["error"]),
+        "per_rule": {rule_id: _metrics(c) for rule_id, c in sorted(counts.items())},
+        "overall": _metrics(overall),
+        "warm_up_seconds": warm_up_seconds,
+        "latency_seconds": total_seconds,
+        "mean_latency_seconds": total_seconds / len(cases) if cases else 0.0,
+        "llm_calls": usage.calls,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "output_tokens_per_second": _ratio(usage.output_tokens, total_seconds),
+        "files_per_minute": _ratio(len(cases) * 60, total_seconds),
+    }
+
+
+def run_evaluation(
+    configs: Optional[List[Dict[str, Any]]] = None,
+    cases: Optional[List[Dict[str, Any]]] = None,
+    backend: Callable[[str, int], Any] = ollama_backend,
+    load_model: Optional[Callable[[str], None]] = load_model_with_ollama,
+) -> List[Dict[str, Any]]:
+    """Evaluate each configuration (default: default_configurations()) on the corpus."""
+    configs = configs if configs is not None else default_configurations()
+    cases = cases if cases is not None else load_labeled_corpus()
+    return [evaluate_configuration(config, cases, backend, load_model) for config in configs]
+
+
+def pick_fastest(
+    reports: List[Dict[str, Any]],
+    min_precision: float = 0.8,
+    min_recall: float = 0.8,
+) -> Optional[Dict[str, Any]]:
+    """Return the lowest-latency report meeting the accuracy bar (None if none does)."""
+    eligible = [
+        r for r in reports
+        if (r["overall"]["precision"] or 0.0) >= min_precision
+        and (r["overall"]["recall"] or 0.0) >= min_recall
+    ]
+    return min(eligible, key=lambda r: r["mean_latency_seconds"], default=None)
+
+
+# ---------- 7. Reporting ----------
+
+def _fmt(value: Optional[float]) -> str:
+    return "–" if value is None else f"{value:.2f}"
+
+
+def format_markdown(reports: List[Dict[str, Any]]) -> str:
+    """Render one summary table plus a per-rule precision/recall table per configuration."""
+    lines = [
+        "# Model / Mode Evaluation",
+        "",
+        "| Model | Mode | Prompt | Precision | Recall | Accuracy | Mean latency (s) | Tokens in | Tokens out | Tok/s | Files/min | Errors |",
+        "|-------|------|--------|-----------|--------|----------|------------------|-----------|------------|-------|-----------|--------|",
+    ]
+    for r in reports:
+        cfg, overall = r["config"], r["overall"]
+        lines.append(
+            f"| {cfg['model']} | {cfg['mode']} | {cfg.get('prompt_variant', 'default')} "
+            f"| {_fmt(overall['precision'])} | {_fmt(overall['recall'])} | {_fmt(overall['accuracy'])} "
+            f"| {r['mean_latency_seconds']:.1f} | {r['input_tokens']} | {r['output_tokens']} "
+            f"| {_fmt(r['output_tokens_per_second'])} | {_fmt(r['files_per_minute'])} | {r['errors']} |"
+        )
+
+    for r in reports:
+        cfg = r["config"]
+        lines += [
+            "",
+            f"## {cfg['model']} / {cfg['mode']} / {cfg.get('prompt_variant', 'default')}",
+            "",
+            "| Rule ID | Precision | Recall | Accuracy |",
+            "|---------|-----------|--------|----------|",
+        ]
+        for rule_id, m in r["per_rule"].items():
+            lines.append(
+                f"| {rule_id} | {_fmt(m['precision'])} | {_fmt(m['recall'])} | {_fmt(m['accuracy'])} |"
+            )
+    return "\n".join(lines) + "\n"
+
+
+# ---------- 8. CLI ----------
+
+if __name__ == "__main__":
+    # Optional: evaluate the models given on the command line instead of the README ones
+    configs = default_configurations(sys.argv[1:] or None)
+
+    reports = run_evaluation(configs)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file = OUTPUT_DIR / f"eval_result_{ts}.json"
+    md_file = OUTPUT_DIR / f"eval_report_{ts}.md"
+    with json_file.open("w", encoding="utf-8") as f:
+        json.dump(reports, f, ensure_ascii=False, indent=2)
+    with md_file.open("w", encoding="utf-8") as f:
+        f.write(format_markdown(reports))
+
+    best = pick_fastest(reports)
+    print("=== Evaluation complete ===")
+    print(f"Eval JSON -> {json_file}")
+    print(f"Eval MD   -> {md_file}")
+    if best:
+        cfg = best["config"]
+        print(f"Fastest passing config -> {cfg['model']} / {cfg['mode']} / {cfg['prompt_variant']}")
+    else:
+        print("No configuration met the accuracy bar.")
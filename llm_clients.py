@@ -0,0 +1,40 @@
+from typing import Dict, Any, Tuple
+
+from langchain_ollama import ChatOllama
+
+from prompt_batching import MAX_BATCH_NUM_PREDICT, batch_num_ctx
+
+
+# ---------- 1. Shared ChatOllama clients ----------
+
+# One client per (model, num_predict, options), built on first use and shared by all agents
+_clients: Dict[Tuple[Any, ...], ChatOllama] = {}
+
+
+def ollama_chat(model: str, num_predict: int, **options: Any) -> ChatOllama:
+    """
+    Return the ChatOllama client for `model` with temperature 0.0.
+    `options` are passed through to ChatOllama (e.g. num_ctx, keep_alive).
+    """
+    key = (model, num_predict, tuple(sorted(options.items())))
+    if key not in _clients:
+        _clients[key] = ChatOllama(
+            model=model,
+            temperature=0.0,
+            num_predict=num_predict,
+            **options,
+        )
+    return _clients[key]
+
+
+def ollama_batch_chat(model: str, num_predict: int, max_files: int, token_budget: int) -> ChatOllama:
+    """
+    Client for every batched request of a run: the output cap is the agent's
+    per-file `num_predict` times `max_files`, capped at MAX_BATCH_NUM_PREDICT,
+    and num_ctx is batch_num_ctx(token_budget).
+    """
+    return ollama_chat(
+        model,
+        min(num_predict * max_files, MAX_BATCH_NUM_PREDICT),
+        num_ctx=batch_num_ctx(token_budget),
+    )
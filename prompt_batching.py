@@ -0,0 +1,82 @@
+import math
+from typing import List, Dict, Any, Callable
+
+
+# ---------- 1. Config ----------
+
+# Prompt tokens per batched request (system prompt + all packed files)
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+
+# Upper bound on files per request
+DEFAULT_MAX_FILES_PER_BATCH = 8
+
+# Output cap for one batched answer (a truncated answer is redone per file).
+# It is fixed rather than scaled per batch so every batch and per-file fallback
+# runs with the same num_ctx: Ollama reloads the model whenever num_ctx changes.
+MAX_BATCH_NUM_PREDICT = 4096
+
+# Rough characters-per-token for code and English text in Qwen tokenizers
+CHARS_PER_TOKEN = 4
+
+
+# ---------- 2. Token estimates ----------
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough for packing, no tokenizer needed."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def batch_num_ctx(token_budget: int) -> int:
+    """Context size for batched runs: the packed prompt plus the largest answer."""
+    return token_budget + MAX_BATCH_NUM_PREDICT
+
+
+# ---------- 3. Packing ----------
+
+def pack_batches(
+    file_ids: List[str],
+    batch_cost: Callable[[List[str]], int],
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_files: int = DEFAULT_MAX_FILES_PER_BATCH,
+) -> List[List[str]]:
+    """
+    Greedily group `file_ids` (in order) into batches whose `batch_cost` stays
+    within `token_budget`. A file that does not fit even on its own gets a
+    batch of one, which callers send as a normal per-file request.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    for file_id in file_ids:
+        candidate = current + [file_id]
+        if current and (len(candidate) > max_files or batch_cost(candidate) > token_budget):
+            batches.append(current)
+            candidate = [file_id]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def batch_ids(keys: List[str]) -> Dict[str, str]:
+    """Map short in-prompt IDs ("F1", "F2", ...) to the caller's file keys."""
+    return {f"F{i + 1}": key for i, key in enumerate(keys)}
+
+
+def split_batch_output(
+    parsed: Dict[str, Any],
+    ids: Dict[str, str],
+    is_valid: Callable[[str, Any], bool],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Pull per-file results out of a batched answer shaped {"files": {"F1": {...}}}.
+    `is_valid(caller_key, result)` checks one file's entry.
+    Returns {caller_key: result} for valid entries only; callers redo the rest per file.
+    """
+    per_file = parsed.get("files") if isinstance(parsed, dict) else None
+    if not isinstance(per_file, dict):
+        return {}
+    return {
+        key: per_file[file_id]
+        for file_id, key in ids.items()
+        if is_valid(key, per_file.get(file_id))
+    }
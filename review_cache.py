@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from agent_b_reviewer import GUIDELINES_INDEX
+
+
+# ---------- 1. Config ----------
+
+CACHE_DIR = Path("outputs/cache")
+
+# Changing the guidelines invalidates every cached review
+RULES_FINGERPRINT = hashlib.sha256(
+    json.dumps(GUIDELINES_INDEX, sort_keys=True).encode("utf-8")
+).hexdigest()[:16]
+
+
+# ---------- 2. Keys ----------
+
+def cache_key(stage: str, **parts: Any) -> str:
+    """Build a stable key from the stage name and everything its output depends on."""
+    payload = json.dumps(
+        {"stage": stage, "rules": RULES_FINGERPRINT, **parts},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return f"{stage}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+# ---------- 3. Get / put ----------
+
+def cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for `key`, or None on a miss (or unreadable entry)."""
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def cache_put(key: str, value: Dict[str, Any]) -> None:
+    """Store `value` under `key`; the write is atomic so readers never see partial files."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{key}.json"
+    tmp = path.with_suffix(f".{os.getpid()}_{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
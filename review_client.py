@@ -0,0 +1,93 @@
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from daemon_config import DAEMON_URL, DEFAULT_PRIORITY
+
+# Thin client for review_daemon.py: standard library only, so it starts
+# instantly (no langchain import).
+
+
+def _call(url: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        raise RuntimeError(json.loads(exc.read()).get("error", str(exc))) from None
+    except urllib.error.URLError as exc:
+        # HTTPError is a URLError too, so this only sees connection failures
+        base = url.rsplit("/", 1)[0]
+        raise ConnectionError(
+            f"Review daemon not running at {base} ({exc.reason}); start it with: python review_daemon.py"
+        ) from None
+
+
+def review(
+    path: str,
+    mode: str = "quick",
+    priority: int = DEFAULT_PRIORITY,
+    with_report: bool = True,
+    save: bool = False,
+    url: str = DAEMON_URL,
+) -> Dict[str, Any]:
+    """
+    Review a file through the daemon.
+    Returns {"agent_a": {"raw", "refined"}, "agent_b": ..., "agent_c": ...},
+    i.e. the contents of run_full_pipeline's output files.
+    """
+    code = Path(path).read_text(encoding="utf-8")
+    return _call(
+        f"{url}/review",
+        {
+            "path": str(Path(path).resolve()),
+            "code": code,
+            "mode": mode,
+            "priority": priority,
+            "with_report": with_report,
+            "save": save,
+        },
+    )
+
+
+def metrics(url: str = DAEMON_URL) -> Dict[str, Any]:
+    return _call(f"{url}/metrics")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review a C++ file via the review daemon.")
+    parser.add_argument("path", nargs="?", help="C++ file to review (omit with --metrics)")
+    parser.add_argument("--mode", choices=["quick", "full"], default="quick")
+    parser.add_argument("--priority", type=int, default=DEFAULT_PRIORITY)
+    parser.add_argument("--no-report", action="store_true", help="skip Agent C")
+    parser.add_argument("--save", action="store_true", help="write the usual output files")
+    parser.add_argument("--metrics", action="store_true", help="print daemon metrics and exit")
+    parser.add_argument("--url", default=DAEMON_URL)
+    args = parser.parse_args()
+
+    if not args.metrics and not args.path:
+        parser.error("path is required unless --metrics is given")
+
+    try:
+        if args.metrics:
+            print(json.dumps(metrics(args.url), indent=2))
+            sys.exit(0)
+        result = review(
+            args.path,
+            mode=args.mode,
+            priority=args.priority,
+            with_report=not args.no_report,
+            save=args.save,
+            url=args.url,
+        )
+    except (ConnectionError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result["agent_b"], indent=2))
+    for name, path in result.get("outputs", {}).items():
+        print(f"{name} -> {path}")
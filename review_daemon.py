@@ -0,0 +1,271 @@
+import itertools
+import json
+import queue
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import agent_a_analyzer
+import agent_b_reviewer
+import agent_c_reporter
+from batch_scheduler import load_model_with_ollama
+from daemon_config import HOST, DEFAULT_PORT, DEFAULT_PRIORITY
+from llm_clients import ollama_chat
+from review_cache import cache_key, cache_get, cache_put
+from run_full_pipeline import output_prefix, run_review_pipeline, save_pipeline_outputs
+
+
+# ---------- 1. Config ----------
+
+WORKERS = 1  # one GPU serves one request at a time anyway
+LATENCY_WINDOW = 1000  # requests kept for latency percentiles
+
+# Ollama keep_alive for the daemon's models (-1 = never unload). Every request
+# resets Ollama's timer to the keep_alive it carries, so the clients send it too.
+KEEP_ALIVE = -1
+
+STAGE_AGENTS = {
+    "agent_a": agent_a_analyzer,
+    "agent_b": agent_b_reviewer,
+    "agent_c": agent_c_reporter,
+}
+
+
+# ---------- 2. Review jobs ----------
+
+class ReviewJob:
+    """One unique review; identical concurrent requests wait on the same job."""
+
+    def __init__(self, key: str, request: Dict[str, Any], priority: int):
+        self.key = key
+        self.request = request
+        self.priority = priority
+        self.started = False
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+
+def make_stage_llms(keep_alive: Any = KEEP_ALIVE) -> Dict[str, Any]:
+    """The agents' default clients, but asking Ollama to keep the models loaded."""
+    return {
+        stage: ollama_chat(agent.MODEL, agent.NUM_PREDICT, keep_alive=keep_alive)
+        for stage, agent in STAGE_AGENTS.items()
+    }
+
+
+# ---------- 3. Daemon ----------
+
+class ReviewDaemon:
+    """Priority queue of review jobs with in-flight deduplication and metrics."""
+
+    def __init__(self, workers: int = WORKERS, keep_alive: Any = KEEP_ALIVE):
+        self.keep_alive = keep_alive
+        self.llms = make_stage_llms(keep_alive)
+        self.queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, ReviewJob] = {}
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {
+            "requests": 0,
+            "completed": 0,
+            "failed": 0,
+            "deduplicated": 0,
+            "cache_hits": 0,
+        }
+        self.started_at = time.time()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"review-worker-{i}", daemon=True).start()
+
+    def warm_up(self) -> None:
+        """Load every stage model into Ollama so the first request is not cold."""
+        for model in {agent.MODEL for agent in STAGE_AGENTS.values()}:
+            print(f"Loading {model} ...")
+            load_model_with_ollama(model, keep_alive=self.keep_alive)
+
+    def submit(self, request: Dict[str, Any], priority: int = DEFAULT_PRIORITY) -> Dict[str, Any]:
+        """Queue (or join) a review and block until it finishes."""
+        start = time.perf_counter()
+        key = cache_key(
+            "daemon",
+            code=request["code"],
+            mode=request["mode"],
+            with_report=request["with_report"],
+            models=[agent.MODEL for agent in STAGE_AGENTS.values()],
+        )
+
+        with self.lock:
+            self.counters["requests"] += 1
+        cached = cache_get(key)
+        if cached is not None:
+            with self.lock:
+                self.counters["cache_hits"] += 1
+                self.latencies.append(time.perf_counter() - start)
+            return {**cached, "cached": True, "deduplicated": False}
+
+        with self.lock:
+            job = self.in_flight.get(key)
+            deduplicated = job is not None
+            if deduplicated:
+                self.counters["deduplicated"] += 1
+                # A more urgent duplicate bumps the queued job; the stale entry is skipped
+                if not job.started and priority < job.priority:
+                    job.priority = priority
+                    self.queue.put((priority, next(self.seq), job))
+            else:
+                job = ReviewJob(key, request, priority)
+                self.in_flight[key] = job
+                self.queue.put((priority, next(self.seq), job))
+
+        job.done.wait()
+        with self.lock:
+            self.latencies.append(time.perf_counter() - start)
+        if job.error is not None:
+            raise RuntimeError(job.error)
+        return {**job.result, "cached": False, "deduplicated": deduplicated}
+
+    def _worker(self) -> None:
+        while True:
+            _, _, job = self.queue.get()
+            with self.lock:
+                if job.started:
+                    continue  # superseded by a higher-priority entry for the same job
+                job.started = True
+            try:
+                job.result = run_review_pipeline(
+                    job.request["code"],
+                    mode=job.request["mode"],
+                    with_report=job.request["with_report"],
+                    llms=self.llms,
+                )
+                cache_put(job.key, job.result)
+                with self.lock:
+                    self.counters["completed"] += 1
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                with self.lock:
+                    self.counters["failed"] += 1
+            finally:
+                with self.lock:
+                    self.in_flight.pop(job.key, None)
+                job.done.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            queued = sum(1 for job in self.in_flight.values() if not job.started)
+            running = len(self.in_flight) - queued
+            counters = dict(self.counters)
+
+        latency: Dict[str, Any] = {"count": len(latencies)}
+        if latencies:
+            latency.update(
+                {
+                    "mean": statistics.fmean(latencies),
+                    "p50": latencies[len(latencies) // 2],
+                    "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                    "max": latencies[-1],
+                }
+            )
+        return {
+            "queue_depth": queued,
+            "running": running,
+            **counters,
+            "latency_seconds": latency,
+            "uptime_seconds": time.time() - self.started_at,
+        }
+
+
+# ---------- 4. HTTP interface ----------
+
+def make_handler(daemon: ReviewDaemon):
+    class ReviewHandler(BaseHTTPRequestHandler):
+        """
+        POST /review   {"code": str, "mode": "quick"|"full", "priority": int,
+                        "with_report": bool, "save": bool, "path": str}
+                       ("path" names the saved files and is required with "save")
+        GET  /metrics  queue depth, counters and latency percentiles
+        GET  /health
+        """
+
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, daemon.metrics())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/review":
+                return self._send(404, {"error": f"Unknown path: {self.path}"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if "code" not in body:
+                    raise ValueError("missing 'code'")
+                request = {
+                    "code": body["code"],
+                    "mode": body.get("mode", "quick"),
+                    "with_report": bool(body.get("with_report", True)),
+                }
+                if not isinstance(request["code"], str) or request["mode"] not in ("quick", "full"):
+                    raise ValueError("'code' must be a string and 'mode' one of quick/full")
+                if body.get("save") and not isinstance(body.get("path"), str):
+                    raise ValueError("'save' needs the source 'path' to name the output files")
+                priority = int(body.get("priority", DEFAULT_PRIORITY))
+            except (KeyError, ValueError, TypeError) as exc:
+                return self._send(400, {"error": f"Bad request: {exc}"})
+
+            try:
+                result = daemon.submit(request, priority)
+            except RuntimeError as exc:
+                return self._send(500, {"error": str(exc)})
+
+            if body.get("save"):
+                paths = save_pipeline_outputs(
+                    result["agent_a"]["raw"],
+                    result["agent_a"]["refined"],
+                    result["agent_b"],
+                    result["agent_c"],
+                    prefix=output_prefix(Path(body["path"])),
+                )
+                result = {**result, "outputs": {k: str(p) for k, p in paths.items()}}
+            self._send(200, result)
+
+        def log_message(self, format, *args):
+            pass  # keep the console for startup / error output
+
+    return ReviewHandler
+
+
+def serve(port: int = DEFAULT_PORT, warm: bool = True) -> None:
+    daemon = ReviewDaemon()
+    if warm:
+        daemon.warm_up()
+    server = ThreadingHTTPServer((HOST, port), make_handler(daemon))
+    print(f"Review daemon listening on http://{HOST}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
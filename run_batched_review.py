@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+from typing import List, Dict, Any
+
+import agent_c_reporter
+from agent_a_analyzer import run_agent_a_batch, load_code
+from agent_b_reviewer import refine_categories_from_code, run_agent_b_batch
+from agent_c_reporter import run_agent_c_reporter
+from llm_clients import ollama_chat
+from prompt_batching import DEFAULT_BATCH_TOKEN_BUDGET, batch_num_ctx
+from run_full_pipeline import output_prefix, save_pipeline_outputs
+
+
+# ---------- 1. Batched pipeline ----------
+
+def run_batched_review(
+    code_paths: List[Path],
+    mode: str = "quick",
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    with_report: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Review many small files, packing several into each Agent A / Agent B request.
+
+    Agent C (if `with_report`) still runs per file, since each report is
+    written for one file, with the batches' num_ctx so the model is not reloaded.
+    Returns {path: {"outputs": {...}}} with the saved file paths.
+    """
+    files = {str(p): load_code(str(p)) for p in code_paths}
+
+    a_results = run_agent_a_batch(files, token_budget=token_budget)
+    a_refined = {key: refine_categories_from_code(files[key], a_results[key]) for key in files}
+
+    b_results = run_agent_b_batch(
+        files,
+        {key: refined.get("selected_rule_categories", []) for key, refined in a_refined.items()},
+        mode=mode,
+        token_budget=token_budget,
+    )
+
+    c_llm = ollama_chat(
+        agent_c_reporter.MODEL,
+        agent_c_reporter.NUM_PREDICT,
+        num_ctx=batch_num_ctx(token_budget),
+    )
+    reviewed: Dict[str, Dict[str, Any]] = {}
+    for key in files:
+        c_result = run_agent_c_reporter(b_results[key], files[key], llm=c_llm) if with_report else {}
+        reviewed[key] = {
+            "outputs": save_pipeline_outputs(
+                a_results[key],
+                a_refined[key],
+                b_results[key],
+                c_result,
+                prefix=output_prefix(Path(key)),
+            )
+        }
+    return reviewed
+
+
+# ---------- 2. CLI ----------
+
+if __name__ == "__main__":
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(Path("samples").glob("*.cpp"))
+    reviewed = run_batched_review(paths)
+
+    print("=== Batched review complete ===")
+    for path, entry in reviewed.items():
+        print(f"{path} -> {entry['outputs']['agent_b']}")
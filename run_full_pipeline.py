@@ -1,6 +1,8 @@
 import json
+import re
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Any, Optional
 
 from agent_a_analyzer import run_agent_a_analyze_and_select, load_code
 from agent_b_reviewer import refine_categories_from_code, run_agent_b_review
@@ -22,38 +24,103 @@ def _ensure_output_dir():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-# ---------- 2. Main pipeline ----------
+def output_prefix(code_path: Path) -> str:
+    """
+    Filename prefix that is unique per source file, e.g. src/foo.h -> "src__foo.h_".
+    Used when several files are reviewed in one run so their outputs don't collide.
+    """
+    path = Path(code_path).resolve()
+    try:
+        path = path.relative_to(Path.cwd())
+    except ValueError:
+        pass
+    name = "__".join(part for part in path.parts if part not in ("/", "\\"))
+    return re.sub(r"[^\w.\-]+", "_", name) + "_"
 
-def run_full_pipeline(code_path: Path):
-    _ensure_output_dir()
 
-    # 1) Load code
-    code = load_code(str(code_path))
+# ---------- 2. Main pipeline ----------
 
-    # 2) Agent A: analyze + select categories
-    a_result = run_agent_a_analyze_and_select(code)
+def run_review_pipeline(
+    code: str,
+    mode: str = "quick",
+    with_report: bool = True,
+    llms: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run A -> refine -> B -> C (C only if `with_report`) on `code`.
+    `llms` optionally maps "agent_a" / "agent_b" / "agent_c" to the chat model to use.
+    Returns {"agent_a": {"raw", "refined"}, "agent_b": ..., "agent_c": ...}.
+    """
+    llms = llms or {}
+
+    # 1) Agent A: analyze + select categories
+    a_result = run_agent_a_analyze_and_select(code, llm=llms.get("agent_a"))
     a_refined = refine_categories_from_code(code, a_result)
 
-    # 3) Agent B: review based on selected categories
+    # 2) Agent B: review based on selected categories
     selected_categories = a_refined.get("selected_rule_categories", [])
     b_result = run_agent_b_review(
         code=code,
         selected_categories=selected_categories,
-        mode="quick",  # or "full"
+        mode=mode,
+        llm=llms.get("agent_b"),
     )
 
-    # 4) Agent C: reporting
-    c_result = run_agent_c_reporter(b_result, code)
+    # 3) Agent C: reporting
+    c_result = run_agent_c_reporter(b_result, code, llm=llms.get("agent_c")) if with_report else {}
 
-    # ---------- 5. Save to files ----------
+    return {
+        "agent_a": {"raw": a_result, "refined": a_refined},
+        "agent_b": b_result,
+        "agent_c": c_result,
+    }
+
+
+def run_full_pipeline(code_path: Path):
+    _ensure_output_dir()
 
+    code = load_code(str(code_path))
+    result = run_review_pipeline(code, mode="quick")  # or "full"
+
+    # ---------- Save to files ----------
+
+    paths = save_pipeline_outputs(
+        result["agent_a"]["raw"],
+        result["agent_a"]["refined"],
+        result["agent_b"],
+        result["agent_c"],
+        prefix=output_prefix(code_path),
+    )
+
+    print("=== Pipeline complete ===")
+    print(f"Agent A JSON  -> {paths['agent_a']}")
+    print(f"Agent B JSON  -> {paths['agent_b']}")
+    print(f"Agent C JSON  -> {paths['agent_c_json']}")
+    print(f"Agent C MD    -> {paths['agent_c_md']}")
+    print(f"Agent C Summary -> {paths['agent_c_summary']}")
+
+
+# ---------- 3. Output files ----------
+
+def save_pipeline_outputs(
+    a_result: Dict[str, Any],
+    a_refined: Dict[str, Any],
+    b_result: Dict[str, Any],
+    c_result: Dict[str, Any],
+    prefix: str = "",
+) -> Dict[str, Path]:
+    """
+    Write the agent results to OUTPUT_DIR and return the file paths.
+    `prefix` is prepended to each filename (used by batch runs to keep files apart).
+    """
+    _ensure_output_dir()
     ts = _timestamp()
 
-    agent_a_file = OUTPUT_DIR / f"agent_a_result_{ts}.json"
-    agent_b_file = OUTPUT_DIR / f"agent_b_result_{ts}.json"
-    agent_c_json_file = OUTPUT_DIR / f"agent_c_result_{ts}.json"
-    agent_c_md_file = OUTPUT_DIR / f"agent_c_report_{ts}.md"
-    agent_c_summary_file = OUTPUT_DIR / f"agent_c_summary_{ts}.txt"
+    agent_a_file = OUTPUT_DIR / f"{prefix}agent_a_result_{ts}.json"
+    agent_b_file = OUTPUT_DIR / f"{prefix}agent_b_result_{ts}.json"
+    agent_c_json_file = OUTPUT_DIR / f"{prefix}agent_c_result_{ts}.json"
+    agent_c_md_file = OUTPUT_DIR / f"{prefix}agent_c_report_{ts}.md"
+    agent_c_summary_file = OUTPUT_DIR / f"{prefix}agent_c_summary_{ts}.txt"
 
     # Save Agent A raw + refined in one JSON
     with agent_a_file.open("w", encoding="utf-8") as f:
@@ -83,12 +150,13 @@ def run_full_pipeline(code_path: Path):
     with agent_c_summary_file.open("w", encoding="utf-8") as f:
         f.write(c_result.get("executive_summary", ""))
 
-    print("=== Pipeline complete ===")
-    print(f"Agent A JSON  -> {agent_a_file}")
-    print(f"Agent B JSON  -> {agent_b_file}")
-    print(f"Agent C JSON  -> {agent_c_json_file}")
-    print(f"Agent C MD    -> {agent_c_md_file}")
-    print(f"Agent C Summary -> {agent_c_summary_file}")
+    return {
+        "agent_a": agent_a_file,
+        "agent_b": agent_b_file,
+        "agent_c_json": agent_c_json_file,
+        "agent_c_md": agent_c_md_file,
+        "agent_c_summary": agent_c_summary_file,
+    }
 
 
 if __name__ == "__main__":